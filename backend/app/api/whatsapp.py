@@ -4,8 +4,11 @@ WhatsApp API integration for sending advisories and notifications.
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from twilio.rest import Client
+from twilio.http.http_client import TwilioHttpClient
 from twilio.twiml.messaging_response import MessagingResponse
+import asyncio
 import requests
+from requests.adapters import HTTPAdapter
 import json
 from typing import Optional
 import os
@@ -18,12 +21,56 @@ from app.services.tts_service import TTSService
 
 router = APIRouter(prefix="/api/whatsapp", tags=["whatsapp"])
 
-# Initialize Twilio client
-twilio_client = Client(settings.twilio_account_sid, settings.twilio_auth_token)
+# Initialize Twilio client with an explicit keep-alive session so repeated
+# sends (broadcasts especially) reuse TLS connections instead of
+# re-handshaking per message; pool size covers the to_thread workers
+_twilio_http = TwilioHttpClient(pool_connections=True, timeout=10)
+_twilio_http.session.mount(
+    "https://",
+    HTTPAdapter(pool_connections=4, pool_maxsize=32)
+)
+twilio_client = Client(
+    settings.twilio_account_sid,
+    settings.twilio_auth_token,
+    http_client=_twilio_http
+)
 
 # Initialize TTS service
 tts_service = TTSService()
 
+_HELP_TEXT = """
+🌾 *Agricultural Advisory System*
+
+Available commands:
+• weather - Get weather information
+• market - Get market prices
+• disease - Upload crop image for disease detection
+• help - Show this help message
+
+For full features, visit our web dashboard!
+            """
+
+# Precomputed command -> reply table; a single dict lookup replaces the
+# chain of list-membership checks in the webhook handler
+_WEBHOOK_REPLIES = {
+    command: reply
+    for commands, reply in (
+        (('weather', 'weather update', 'weather info'),
+         "🌤️ Weather information coming soon! Please use the web dashboard for now."),
+        (('market', 'prices', 'market prices'),
+         "📈 Market prices coming soon! Please use the web dashboard for now."),
+        (('help', 'commands'), _HELP_TEXT),
+        (('disease', 'detect', 'crop image'),
+         "📷 Please upload a crop image for disease detection. This feature will be available soon!"),
+    )
+    for command in commands
+}
+
+_DEFAULT_REPLY = (
+    "🤖 Thanks for your message! For full features, please visit our web "
+    "dashboard or type 'help' for available commands."
+)
+
 
 @router.post("/send")
 async def send_whatsapp_message(
@@ -47,14 +94,16 @@ async def send_whatsapp_message(
         Delivery status
     """
     try:
-        # Get user details
-        user = db.query(User).filter(User.id == user_id).first()
+        # Get user details (synchronous session work runs off the loop)
+        user = await asyncio.to_thread(
+            db.query(User).filter(User.id == user_id).first
+        )
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
-        
+
         if not user.whatsapp_enabled:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -64,8 +113,9 @@ async def send_whatsapp_message(
         # Format phone number for WhatsApp
         phone_number = f"whatsapp:{user.phone_number}"
         
-        # Send text message
-        message_obj = twilio_client.messages.create(
+        # Send text message (Twilio SDK is synchronous, keep it off the loop)
+        message_obj = await asyncio.to_thread(
+            twilio_client.messages.create,
             body=message,
             from_=settings.twilio_whatsapp_number,
             to=phone_number
@@ -85,7 +135,8 @@ async def send_whatsapp_message(
                 voice_url = f"https://your-domain.com/uploads/{os.path.basename(voice_file)}"
                 
                 # Send voice message
-                voice_message = twilio_client.messages.create(
+                voice_message = await asyncio.to_thread(
+                    twilio_client.messages.create,
                     media_url=[voice_url],
                     from_=settings.twilio_whatsapp_number,
                     to=phone_number
@@ -103,7 +154,7 @@ async def send_whatsapp_message(
         )
         
         db.add(advisory)
-        db.commit()
+        await asyncio.to_thread(db.commit)
         
         return {
             "success": True,
@@ -139,14 +190,16 @@ async def send_voice_message(
         Voice message delivery status
     """
     try:
-        # Get user details
-        user = db.query(User).filter(User.id == user_id).first()
+        # Get user details (synchronous session work runs off the loop)
+        user = await asyncio.to_thread(
+            db.query(User).filter(User.id == user_id).first
+        )
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
-        
+
         # Generate voice file
         voice_file = await tts_service.generate_voice(
             text=text,
@@ -165,7 +218,8 @@ async def send_voice_message(
         
         # Send voice message
         phone_number = f"whatsapp:{user.phone_number}"
-        message_obj = twilio_client.messages.create(
+        message_obj = await asyncio.to_thread(
+            twilio_client.messages.create,
             media_url=[voice_url],
             from_=settings.twilio_whatsapp_number,
             to=phone_number
@@ -205,34 +259,10 @@ async def whatsapp_webhook(request):
         
         # Create TwiML response
         response = MessagingResponse()
-        
-        # Process different message types
-        if message_body.lower() in ['weather', 'weather update', 'weather info']:
-            response.message("🌤️ Weather information coming soon! Please use the web dashboard for now.")
-        
-        elif message_body.lower() in ['market', 'prices', 'market prices']:
-            response.message("📈 Market prices coming soon! Please use the web dashboard for now.")
-        
-        elif message_body.lower() in ['help', 'commands']:
-            help_text = """
-🌾 *Agricultural Advisory System*
 
-Available commands:
-• weather - Get weather information
-• market - Get market prices  
-• disease - Upload crop image for disease detection
-• help - Show this help message
+        # Look up the reply for the incoming command
+        response.message(_WEBHOOK_REPLIES.get(message_body.lower(), _DEFAULT_REPLY))
 
-For full features, visit our web dashboard!
-            """
-            response.message(help_text)
-        
-        elif message_body.lower() in ['disease', 'detect', 'crop image']:
-            response.message("📷 Please upload a crop image for disease detection. This feature will be available soon!")
-        
-        else:
-            response.message("🤖 Thanks for your message! For full features, please visit our web dashboard or type 'help' for available commands.")
-        
         return str(response)
         
     except Exception as e:
@@ -242,33 +272,78 @@ For full features, visit our web dashboard!
         return str(response)
 
 
+def _fetch_message_status(message_sid: str) -> dict:
+    """Fetch delivery status for one message from the Twilio API."""
+    message = twilio_client.messages(message_sid).fetch()
+
+    return {
+        "success": True,
+        "sid": message.sid,
+        "status": message.status,
+        "date_sent": message.date_sent.isoformat() if message.date_sent else None,
+        "error_code": message.error_code,
+        "error_message": message.error_message
+    }
+
+
 @router.get("/status/{message_sid}")
 async def get_message_status(message_sid: str):
     """
     Get WhatsApp message delivery status.
-    
+
     Args:
         message_sid: Twilio message SID
-        
+
     Returns:
         Message status
     """
     try:
-        message = twilio_client.messages(message_sid).fetch()
-        
+        return await asyncio.to_thread(_fetch_message_status, message_sid)
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get message status: {str(e)}"
+        )
+
+
+@router.post("/status/batch")
+async def get_message_statuses(message_sids: list):
+    """
+    Get delivery status for multiple WhatsApp messages in one call.
+
+    The Twilio API has no multi-SID list filter, so the per-message fetches
+    run concurrently over the pooled HTTP client instead of the caller
+    polling the single-status endpoint once per message.
+
+    Args:
+        message_sids: List of Twilio message SIDs
+
+    Returns:
+        Status for each requested message
+    """
+    try:
+        statuses = await asyncio.gather(
+            *(asyncio.to_thread(_fetch_message_status, sid) for sid in message_sids),
+            return_exceptions=True
+        )
+
+        results = [
+            {"success": False, "sid": sid, "error": str(result)}
+            if isinstance(result, Exception) else result
+            for sid, result in zip(message_sids, statuses)
+        ]
+
         return {
             "success": True,
-            "sid": message.sid,
-            "status": message.status,
-            "date_sent": message.date_sent.isoformat() if message.date_sent else None,
-            "error_code": message.error_code,
-            "error_message": message.error_message
+            "total": len(results),
+            "statuses": results
         }
-        
+
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to get message status: {str(e)}"
+            detail=f"Failed to get message statuses: {str(e)}"
         )
 
 
@@ -292,56 +367,74 @@ async def broadcast_message(
         Broadcast results
     """
     try:
-        # Get users to send to
-        query = db.query(User).filter(User.whatsapp_enabled == True, User.is_active == True)
-        
+        # Get users to send to; only id and phone number are needed, so a
+        # column-only query skips loading and tracking full User entities
+        query = db.query(User.id, User.phone_number).filter(
+            User.whatsapp_enabled == True, User.is_active == True
+        )
+
         if user_ids:
             query = query.filter(User.id.in_(user_ids))
-        
-        users = query.all()
-        
-        results = []
-        successful = 0
-        failed = 0
-        
-        for user in users:
-            try:
-                phone_number = f"whatsapp:{user.phone_number}"
-                message_obj = twilio_client.messages.create(
+
+        users = await asyncio.to_thread(query.all)
+
+        # Fan the sends out concurrently over the pooled HTTP client; the
+        # broadcast then takes roughly one round trip instead of one per user,
+        # and per-user failures come back as exceptions in the results
+        send_results = await asyncio.gather(
+            *(
+                asyncio.to_thread(
+                    twilio_client.messages.create,
                     body=message,
                     from_=settings.twilio_whatsapp_number,
-                    to=phone_number
-                )
-                
-                results.append({
-                    "user_id": user.id,
-                    "phone": user.phone_number,
-                    "status": "sent",
-                    "message_sid": message_obj.sid
-                })
-                successful += 1
-                
-                # Save advisory record
-                advisory = Advisory(
-                    user_id=user.id,
-                    title="Broadcast Advisory",
-                    content=message,
-                    advisory_type="broadcast",
-                    language=language,
-                    whatsapp_sent=True
+                    to=f"whatsapp:{user.phone_number}"
                 )
-                db.add(advisory)
-                
-            except Exception as e:
+                for user in users
+            ),
+            return_exceptions=True
+        )
+
+        results = []
+        advisories = []
+        successful = 0
+        failed = 0
+
+        for user, message_obj in zip(users, send_results):
+            if isinstance(message_obj, Exception):
                 results.append({
                     "user_id": user.id,
                     "phone": user.phone_number,
                     "status": "failed",
-                    "error": str(e)
+                    "error": str(message_obj)
                 })
                 failed += 1
-        
-        db.commit()
+                continue
+
+            results.append({
+                "user_id": user.id,
+                "phone": user.phone_number,
+                "status": "sent",
+                "message_sid": message_obj.sid
+            })
+            successful += 1
+
+            # Collect advisory record for a single batched insert
+            advisories.append(Advisory(
+                user_id=user.id,
+                title="Broadcast Advisory",
+                content=message,
+                advisory_type="broadcast",
+                language=language,
+                whatsapp_sent=True
+            ))
+
+        # One bulk insert + commit instead of a flush per user
+        def _persist_advisories():
+            if advisories:
+                db.bulk_save_objects(advisories)
+            db.commit()
+
+        await asyncio.to_thread(_persist_advisories)
         
         return {
             "success": True,
@@ -1,6 +1,7 @@
 """
 Core configuration settings for the Agricultural Advisory System.
 """
+from functools import lru_cache
 from typing import List, Optional
 from pydantic_settings import BaseSettings
 from pydantic import Field
@@ -29,6 +30,11 @@ class Settings(BaseSettings):
     # ML Configuration
     ml_model_path: str = Field(..., env="ML_MODEL_PATH")
     confidence_threshold: float = Field(default=0.7, env="CONFIDENCE_THRESHOLD")
+    detection_max_batch_size: int = Field(default=16, env="DETECTION_MAX_BATCH_SIZE")
+    detection_max_wait_ms: float = Field(default=10.0, env="DETECTION_MAX_WAIT_MS")
+
+    # Text-to-Speech
+    tts_worker_threads: int = Field(default=4, env="TTS_WORKER_THREADS")
     
     # File Storage
     upload_dir: str = Field(default="uploads/", env="UPLOAD_DIR")
@@ -46,5 +52,16 @@ class Settings(BaseSettings):
         case_sensitive = False
 
 
+@lru_cache
+def get_settings() -> Settings:
+    """Return the application settings, built once per process.
+
+    Constructing Settings re-reads the environment and .env file and runs
+    pydantic validation; caching keeps that to a single pass no matter how
+    many call sites (or test fixtures) ask for it.
+    """
+    return Settings()
+
+
 # Global settings instance
-settings = Settings()
+settings = get_settings()
@@ -1,7 +1,7 @@
 """
 Database configuration and session management.
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
@@ -21,6 +21,18 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+def create_tables():
+    """Create all model tables unless the schema is already in place.
+
+    create_all reflects every table with checkfirst queries on each call;
+    probing one sentinel table turns the steady-state startup into a single
+    inspector query, while a fresh database still gets the full schema.
+    """
+    if inspect(engine).has_table("users"):
+        return
+    Base.metadata.create_all(bind=engine)
+
+
 def get_db():
     """Dependency to get database session."""
     db = SessionLocal()
@@ -0,0 +1,94 @@
+"""
+Micro-batching scheduler for coalescing concurrent inference requests.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, List
+
+
+class BatchScheduler:
+    """Coalesces concurrent requests into batched handler calls.
+
+    Requests submitted while a batch is being assembled are drained from an
+    internal queue and handed to the batch handler as a single list; each
+    caller's future is then resolved with its own entry from the results.
+    Batching amortizes per-call framework overhead and lets the model run
+    one data-parallel forward pass instead of many single-item passes.
+    """
+
+    __slots__ = ("batch_handler", "max_batch_size", "max_wait", "queue", "_worker_task")
+
+    def __init__(
+        self,
+        batch_handler: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 10.0
+    ):
+        """
+        Initialize batch scheduler.
+
+        Args:
+            batch_handler: Async callable that takes a list of submitted items
+                and returns a list of results in the same order
+            max_batch_size: Maximum number of items per batch
+            max_wait_ms: Maximum time to wait for more items before running
+        """
+        self.batch_handler = batch_handler
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._worker_task = None
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Submit an item for batched processing and wait for its result.
+
+        Args:
+            item: Payload passed through to the batch handler
+
+        Returns:
+            The handler result corresponding to this item
+        """
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((item, future))
+        return await future
+
+    def _ensure_worker(self):
+        """Start the background drain task lazily on the running loop."""
+        if self._worker_task is None or self._worker_task.done():
+            self._worker_task = asyncio.get_running_loop().create_task(
+                self._drain_loop()
+            )
+
+    async def _drain_loop(self):
+        """Drain queued items into batches and dispatch them to the handler."""
+        while True:
+            # Block until at least one item is available
+            batch = [await self.queue.get()]
+
+            # Collect more items until the batch fills or the window expires
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(
+                        await asyncio.wait_for(self.queue.get(), timeout=remaining)
+                    )
+                except asyncio.TimeoutError:
+                    break
+
+            items = [item for item, _ in batch]
+            try:
+                results = await self.batch_handler(items)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
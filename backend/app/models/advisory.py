@@ -1,7 +1,8 @@
 """
 Advisory model for storing generated agricultural advisories.
 """
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, Index, JSON
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -9,9 +10,13 @@ from app.core.database import Base
 
 class Advisory(Base):
     """Advisory model for storing agricultural recommendations."""
-    
+
     __tablename__ = "advisories"
-    
+    __table_args__ = (
+        # Covers per-user advisory listings ordered by recency
+        Index("ix_advisories_user_created", "user_id", "created_at"),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     
@@ -24,10 +29,10 @@ class Advisory(Base):
     language = Column(String(10), default="en")
     voice_file_path = Column(String(500))
     
-    # Advisory context
-    weather_data = Column(Text)  # JSON string
-    market_data = Column(Text)   # JSON string
-    disease_data = Column(Text)  # JSON string
+    # Advisory context; JSONB on PostgreSQL, plain JSON elsewhere
+    weather_data = Column(JSON().with_variant(JSONB(), "postgresql"))
+    market_data = Column(JSON().with_variant(JSONB(), "postgresql"))
+    disease_data = Column(JSON().with_variant(JSONB(), "postgresql"))
     
     # Delivery status
     whatsapp_sent = Column(Boolean, default=False)
@@ -11,6 +11,7 @@ from sqlalchemy import (
     Float,
     ForeignKey,
     Boolean,
+    Index,
 )
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -21,12 +22,17 @@ class CropImage(Base):
     """Crop image model for disease detection."""
 
     __tablename__ = "crop_images"
+    __table_args__ = (
+        # Covers the per-user history query (filter by user, newest first)
+        Index("ix_crop_images_user_created", "user_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     filename = Column(String(255), nullable=False)
     file_path = Column(String(500), nullable=False)
     file_size = Column(Integer)
+    content_hash = Column(String(64), index=True)  # sha256 of the upload
 
     # Disease detection results
     predicted_disease = Column(String(100))
@@ -1,16 +1,22 @@
 """
 Market data model for storing crop prices and market trends.
 """
-from sqlalchemy import Column, Integer, String, DateTime, Float, Text
+from sqlalchemy import Column, Integer, String, DateTime, Float, JSON, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from app.core.database import Base
 
 
 class MarketData(Base):
     """Market data model for storing crop prices and trends."""
-    
+
     __tablename__ = "market_data"
-    
+    __table_args__ = (
+        # Covers "latest price for crop X in market Y" lookups
+        Index("ix_market_data_crop_location_recorded",
+              "crop_name", "state", "district", "recorded_at"),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     
     # Crop information
@@ -33,8 +39,8 @@ class MarketData(Base):
     supply = Column(String(20))  # high, medium, low
     market_trend = Column(String(20))  # rising, falling, stable
     
-    # Additional data (JSON string)
-    additional_data = Column(Text)
+    # Additional data; JSONB on PostgreSQL, plain JSON elsewhere
+    additional_data = Column(JSON().with_variant(JSONB(), "postgresql"))
     
     # Data source and timing
     data_source = Column(String(50), default="market_api")
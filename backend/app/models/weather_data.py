@@ -1,16 +1,21 @@
 """
 Weather data model for storing current and historical weather information.
 """
-from sqlalchemy import Column, Integer, String, DateTime, Float, Text
+from sqlalchemy import Column, Integer, String, DateTime, Float, JSON, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from app.core.database import Base
 
 
 class WeatherData(Base):
     """Weather data model for storing weather information."""
-    
+
     __tablename__ = "weather_data"
-    
+    __table_args__ = (
+        # Covers the "recent weather for this location" lookup
+        Index("ix_weather_data_lat_lon_recorded", "latitude", "longitude", "recorded_at"),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     
     # Location
@@ -31,8 +36,9 @@ class WeatherData(Base):
     condition = Column(String(50))  # clear, cloudy, rain, etc.
     description = Column(String(100))
     
-    # Forecast data (JSON string for multiple days)
-    forecast_data = Column(Text)
+    # Forecast data for multiple days; JSONB on PostgreSQL stores the parsed
+    # document (binary, indexable) instead of re-parsing a text blob
+    forecast_data = Column(JSON().with_variant(JSONB(), "postgresql"))
     
     # Data source and timing
     data_source = Column(String(50), default="openweather")
@@ -3,75 +3,207 @@ Text-to-Speech service for multi-language support.
 """
 import os
 import asyncio
-from typing import Optional
-from gtts import gTTS
-import pyttsx3
+import hashlib
+import json
+import re
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import AsyncIterator, Optional
+import httpx
 from pathlib import Path
-import uuid
-from datetime import datetime
+
+# gtts and pyttsx3 are imported lazily inside the methods that use them:
+# pyttsx3 probes audio drivers at init and gtts drags in requests, neither
+# of which should tax startup when most advisories use the direct HTTP path
 
 from app.core.config import settings
 
+# Endpoint the gTTS library ultimately targets; calling it directly over the
+# shared async client skips the library's synchronous requests session for
+# texts short enough to fit in a single TTS request
+TRANSLATE_TTS_URL = "https://translate.google.com/translate_tts"
+TRANSLATE_TTS_MAX_CHARS = 200
+
+# Upper bound on concurrent translate_tts fetches across all requests; a
+# broadcast fan-out queues behind this instead of opening one connection
+# per chunk at once
+TRANSLATE_TTS_MAX_CONCURRENCY = 8
+
+# Markup characters are dropped, whitespace runs collapse to one space; a
+# single compiled pattern walks the text once instead of a split/join plus
+# one str.replace scan per character
+_CLEAN_PATTERN = re.compile(r"[*#_]+|\s+")
+
+
+def _clean_replacement(match: re.Match) -> str:
+    """Replacement callback: markup vanishes, whitespace becomes a space."""
+    return "" if match.group(0)[0] in "*#_" else " "
+
+
+# Sentence boundaries (including the Indic danda) used to split long texts
+_SENTENCE_PATTERN = re.compile(r"(?<=[.!?।])\s+")
+
+
+def _split_text(text: str, limit: int) -> list:
+    """Split text into chunks of at most limit characters.
+
+    Splits fall on sentence boundaries where possible so each chunk sounds
+    natural on its own; a single over-long sentence is hard-split on words.
+    """
+    chunks = []
+    current = ""
+    for sentence in _SENTENCE_PATTERN.split(text):
+        while len(sentence) > limit:
+            # Pathologically long sentence: break on the last word boundary
+            cut = sentence.rfind(' ', 0, limit)
+            if cut <= 0:
+                cut = limit
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        candidate = f"{current} {sentence}".strip() if current else sentence
+        if len(candidate) > limit:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+# Language codes mapping; a read-only module constant so lookups skip the
+# instance -> class attribute chain and nothing can mutate the table
+LANGUAGE_CODES = MappingProxyType({
+    'en': 'en',      # English
+    'hi': 'hi',      # Hindi
+    'te': 'te',      # Telugu
+    'ta': 'ta',      # Tamil
+    'bn': 'bn',      # Bengali
+    'gu': 'gu',      # Gujarati
+    'kn': 'kn',      # Kannada
+    'ml': 'ml',      # Malayalam
+    'mr': 'mr',      # Marathi
+    'pa': 'pa',      # Punjabi
+    'or': 'or'       # Odia
+})
+
+# Voice settings for different languages
+VOICE_SETTINGS = MappingProxyType({
+    'en': {
+        'engine': 'gtts',
+        'voice_id': 'en-us',
+        'rate': 150,
+        'volume': 0.8
+    },
+    'hi': {
+        'engine': 'gtts',
+        'voice_id': 'hi-in',
+        'rate': 140,
+        'volume': 0.8
+    },
+    'te': {
+        'engine': 'gtts',
+        'voice_id': 'te-in',
+        'rate': 140,
+        'volume': 0.8
+    },
+    'ta': {
+        'engine': 'gtts',
+        'voice_id': 'ta-in',
+        'rate': 140,
+        'volume': 0.8
+    }
+})
+
 
 class TTSService:
     """Text-to-Speech service supporting multiple languages."""
-    
-    # Language codes mapping
-    LANGUAGE_CODES = {
-        'en': 'en',      # English
-        'hi': 'hi',      # Hindi
-        'te': 'te',      # Telugu
-        'ta': 'ta',      # Tamil
-        'bn': 'bn',      # Bengali
-        'gu': 'gu',      # Gujarati
-        'kn': 'kn',      # Kannada
-        'ml': 'ml',      # Malayalam
-        'mr': 'mr',      # Marathi
-        'pa': 'pa',      # Punjabi
-        'or': 'or'       # Odia
-    }
-    
-    # Voice settings for different languages
-    VOICE_SETTINGS = {
-        'en': {
-            'engine': 'gtts',
-            'voice_id': 'en-us',
-            'rate': 150,
-            'volume': 0.8
-        },
-        'hi': {
-            'engine': 'gtts',
-            'voice_id': 'hi-in',
-            'rate': 140,
-            'volume': 0.8
-        },
-        'te': {
-            'engine': 'gtts',
-            'voice_id': 'te-in',
-            'rate': 140,
-            'volume': 0.8
-        },
-        'ta': {
-            'engine': 'gtts',
-            'voice_id': 'ta-in',
-            'rate': 140,
-            'volume': 0.8
-        }
-    }
-    
+
+    # Aliases kept for callers that reach the tables through the class
+    LANGUAGE_CODES = LANGUAGE_CODES
+    VOICE_SETTINGS = VOICE_SETTINGS
+
+    # Upper bound for the in-memory cache of recently generated files
+    CACHE_SIZE = 512
+
+    # Sidecar file that carries the cache index across restarts
+    CACHE_INDEX_NAME = "cache_index.json"
+
     def __init__(self):
         """Initialize TTS service."""
         self.output_dir = Path(settings.upload_dir) / "voice"
+        self._cache_index_path = self.output_dir / self.CACHE_INDEX_NAME
+
+        # Directory creation and the cache index read happen on first use,
+        # not here: the module-level instance would otherwise touch the
+        # filesystem whenever the module is imported
+        self._storage_ready = False
+
+        # (language, cleaned text) -> file path for recently generated audio;
+        # warmed from the sidecar index so a restart keeps its hit rate
+        self._cache: OrderedDict = OrderedDict()
+
+        # (language, cleaned text) -> future for synthesis currently running
+        self._inflight: dict = {}
+
+        # pyttsx3 keeps mutable state on one engine object and runAndWait is
+        # not reentrant, so offline synthesis must run one job at a time
+        self._offline_semaphore = asyncio.Semaphore(1)
+
+        # Dedicated pool for synthesis work: sizing it independently keeps a
+        # TTS burst from exhausting the loop's shared default executor, and
+        # the worker count is an explicit deployment knob
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.tts_worker_threads,
+            thread_name_prefix="tts"
+        )
+
+        # Async client for direct translate_tts calls; keep-alive connections
+        # are reused across requests instead of a TLS handshake per call
+        self._http_client = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=8),
+            headers={"User-Agent": "Mozilla/5.0"}
+        )
+
+        # Shared across every generate/stream call so high-concurrency
+        # fan-outs (advisory broadcasts) degrade to a bounded queue rather
+        # than a connection storm against the TTS endpoint
+        self._fetch_semaphore = asyncio.Semaphore(TRANSLATE_TTS_MAX_CONCURRENCY)
+
+        # The pyttsx3 engine is created on first offline use, not here: the
+        # module-level service instance would otherwise probe audio drivers
+        # during application import
+        self.offline_engine = None
+        self._offline_engine_ready = False
+
+    def _ensure_storage(self):
+        """Create the voice directory and warm the cache on first use."""
+        if self._storage_ready:
+            return
+        self._storage_ready = True
         self.output_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Initialize pyttsx3 engine for offline TTS
+        self._load_cache_index()
+
+    def _ensure_offline_engine(self) -> bool:
+        """Create the pyttsx3 engine on first use, importing it lazily."""
+        if self._offline_engine_ready:
+            return self.offline_engine is not None
+
+        self._offline_engine_ready = True
         try:
+            import pyttsx3
             self.offline_engine = pyttsx3.init()
             self._configure_offline_engine()
         except Exception as e:
             print(f"Failed to initialize offline TTS engine: {e}")
             self.offline_engine = None
-    
+        return self.offline_engine is not None
+
     def _configure_offline_engine(self):
         """Configure offline TTS engine."""
         if self.offline_engine:
@@ -99,52 +231,198 @@ class TTSService:
         Args:
             text: Text to convert to speech
             language: Language code
-            user_id: User ID for file naming
-            
+            user_id: User ID (unused for naming; files are content-addressed)
+
         Returns:
             Path to generated voice file or None if failed
         """
         try:
+            self._ensure_storage()
+
             # Validate language
-            if language not in self.LANGUAGE_CODES:
+            if language not in LANGUAGE_CODES:
                 language = 'en'  # Default to English
-            
+
             # Clean and prepare text
             cleaned_text = self._clean_text(text)
             if not cleaned_text:
                 return None
-            
-            # Generate unique filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"voice_{user_id or 'anon'}_{timestamp}_{uuid.uuid4().hex[:8]}.mp3"
+
+            # Content-addressed filename: identical (text, language) pairs
+            # map to the same file, so repeated advisories reuse the audio
+            # generated the first time instead of re-synthesizing
+            cache_key = (language, cleaned_text)
+            cached_path = self._cache_lookup(cache_key)
+            if cached_path:
+                return cached_path
+
+            digest = hashlib.sha256(f"{language}:{cleaned_text}".encode()).hexdigest()[:16]
+            filename = f"voice_{language}_{digest}.mp3"
             file_path = self.output_dir / filename
-            
-            # Get voice settings
-            voice_settings = self.VOICE_SETTINGS.get(language, self.VOICE_SETTINGS['en'])
-            
-            # Generate voice file
-            if voice_settings['engine'] == 'gtts':
-                success = await self._generate_with_gtts(
-                    text=cleaned_text,
-                    language=language,
-                    file_path=file_path
-                )
-            else:
-                success = await self._generate_with_offline(
-                    text=cleaned_text,
-                    language=language,
-                    file_path=file_path,
-                    settings=voice_settings
-                )
-            
-            if success and file_path.exists():
+
+            # The file may already exist on disk from a previous process
+            if file_path.exists():
+                self._cache_store(cache_key, str(file_path))
                 return str(file_path)
-            
-            return None
-            
+
+            # Another request may already be synthesizing this exact audio;
+            # wait on its result instead of issuing a duplicate engine call
+            existing = self._inflight.get(cache_key)
+            if existing is not None:
+                return await existing
+
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[cache_key] = future
+            result = None
+            try:
+                result = await self._synthesize(cleaned_text, language, file_path)
+            finally:
+                self._inflight.pop(cache_key, None)
+                future.set_result(result)
+
+            if result:
+                self._cache_store(cache_key, result)
+            return result
+
         except Exception as e:
             print(f"Error generating voice: {e}")
             return None
+
+    async def stream_voice(
+        self,
+        text: str,
+        language: str = 'en'
+    ) -> AsyncIterator[bytes]:
+        """
+        Yield MP3 audio for text as it is synthesized.
+
+        Chunk fetches are started concurrently and their payloads yielded in
+        text order, so a StreamingResponse caller sends the first audio bytes
+        while later chunks are still in flight instead of waiting for the
+        whole file. The joined audio is also written to the content-addressed
+        cache so later generate_voice calls hit disk.
+
+        Args:
+            text: Text to convert to speech
+            language: Language code
+        """
+        self._ensure_storage()
+
+        if language not in LANGUAGE_CODES:
+            language = 'en'
+
+        cleaned_text = self._clean_text(text)
+        if not cleaned_text:
+            return
+
+        # A cached file streams straight from disk
+        cache_key = (language, cleaned_text)
+        digest = hashlib.sha256(f"{language}:{cleaned_text}".encode()).hexdigest()[:16]
+        file_path = self.output_dir / f"voice_{language}_{digest}.mp3"
+        if file_path.exists():
+            yield file_path.read_bytes()
+            return
+
+        chunks = (
+            [cleaned_text]
+            if len(cleaned_text) <= TRANSLATE_TTS_MAX_CHARS
+            else _split_text(cleaned_text, TRANSLATE_TTS_MAX_CHARS)
+        )
+        tasks = [
+            asyncio.ensure_future(self._fetch_tts_chunk(chunk, language))
+            for chunk in chunks
+        ]
+
+        parts = []
+        try:
+            for task in tasks:
+                audio = await task
+                if not audio:
+                    raise RuntimeError("translate_tts returned no audio")
+                parts.append(audio)
+                yield audio
+        except Exception as e:
+            for task in tasks:
+                task.cancel()
+            print(f"Streaming voice synthesis failed: {e}")
+            return
+
+        file_path.write_bytes(b"".join(parts))
+        self._cache_store(cache_key, str(file_path))
+
+    async def _synthesize(
+        self,
+        text: str,
+        language: str,
+        file_path: Path
+    ) -> Optional[str]:
+        """Run the configured engine and return the output path on success."""
+        voice_settings = VOICE_SETTINGS.get(language, VOICE_SETTINGS['en'])
+
+        if voice_settings['engine'] == 'gtts':
+            success = await self._generate_with_gtts(
+                text=text,
+                language=language,
+                file_path=file_path
+            )
+        else:
+            success = await self._generate_with_offline(
+                text=text,
+                language=language,
+                file_path=file_path,
+                settings=voice_settings
+            )
+
+        if success and file_path.exists():
+            return str(file_path)
+        return None
+
+    def _cache_lookup(self, cache_key) -> Optional[str]:
+        """Return the cached path for a key if its file still exists."""
+        path = self._cache.get(cache_key)
+        if path is None:
+            return None
+        if not os.path.exists(path):
+            # Cleaned up on disk; drop the stale entry
+            del self._cache[cache_key]
+            return None
+        self._cache.move_to_end(cache_key)
+        return path
+
+    def _cache_store(self, cache_key, path: str):
+        """Record a generated file, evicting the oldest entry when full."""
+        self._cache[cache_key] = path
+        self._cache.move_to_end(cache_key)
+        if len(self._cache) > self.CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+        # Snapshot on this thread, write on a worker: the index update never
+        # adds disk latency to the synthesis path
+        snapshot = [
+            [language, text, file_path]
+            for (language, text), file_path in self._cache.items()
+        ]
+        self._executor.submit(self._write_cache_index, snapshot)
+
+    def _load_cache_index(self):
+        """Warm the in-memory cache from the sidecar index, if present."""
+        try:
+            if not self._cache_index_path.exists():
+                return
+            entries = json.loads(self._cache_index_path.read_text())
+            for language, text, file_path in entries[-self.CACHE_SIZE:]:
+                # Cleanup may have removed files the index still mentions
+                if os.path.exists(file_path):
+                    self._cache[(language, text)] = file_path
+        except Exception as e:
+            print(f"Failed to load voice cache index: {e}")
+
+    def _write_cache_index(self, snapshot):
+        """Persist a cache snapshot; losing it only costs warm-start hits."""
+        try:
+            self._cache_index_path.write_text(json.dumps(snapshot))
+        except Exception as e:
+            print(f"Failed to save voice cache index: {e}")
     
     async def _generate_with_gtts(
         self, 
@@ -154,13 +432,24 @@ class TTSService:
     ) -> bool:
         """Generate voice using Google Text-to-Speech."""
         try:
-            # Run in thread pool to avoid blocking
+            # Short texts go straight to translate_tts over the async client;
+            # no worker thread and no per-call requests session
+            if len(text) <= TRANSLATE_TTS_MAX_CHARS:
+                if await self._gtts_async_generate(text, language, file_path):
+                    return True
+            # Longer texts are split at sentence boundaries and their chunks
+            # fetched concurrently, then concatenated; gTTS would issue the
+            # same chunk requests one after another
+            elif await self._gtts_parallel_generate(text, language, file_path):
+                return True
+
+            # Run in the TTS thread pool to avoid blocking
             loop = asyncio.get_event_loop()
             success = await loop.run_in_executor(
-                None, 
-                self._gtts_sync_generate, 
-                text, 
-                language, 
+                self._executor,
+                self._gtts_sync_generate,
+                text,
+                language,
                 file_path
             )
             return success
@@ -168,11 +457,64 @@ class TTSService:
             print(f"gTTS generation failed: {e}")
             return False
     
+    async def _gtts_async_generate(self, text: str, language: str, file_path: Path) -> bool:
+        """Fetch a single-chunk MP3 from translate_tts without a thread hop."""
+        try:
+            audio = await self._fetch_tts_chunk(text, language)
+            if not audio:
+                return False
+
+            file_path.write_bytes(audio)
+            return True
+        except Exception as e:
+            # Fall back to the gTTS library path
+            print(f"Direct translate_tts request failed: {e}")
+            return False
+
+    async def _gtts_parallel_generate(self, text: str, language: str, file_path: Path) -> bool:
+        """Synthesize a long text as concurrently fetched MP3 chunks.
+
+        MP3 is a frame stream, so the per-chunk payloads can be concatenated
+        back-to-back in text order; this is the same joining gTTS does when
+        it writes its sequential chunk responses into one file.
+        """
+        try:
+            chunks = _split_text(text, TRANSLATE_TTS_MAX_CHARS)
+            parts = await asyncio.gather(
+                *(self._fetch_tts_chunk(chunk, language) for chunk in chunks)
+            )
+            if not all(parts):
+                return False
+
+            file_path.write_bytes(b"".join(parts))
+            return True
+        except Exception as e:
+            print(f"Parallel translate_tts generation failed: {e}")
+            return False
+
+    async def _fetch_tts_chunk(self, text: str, language: str) -> Optional[bytes]:
+        """Fetch the MP3 bytes for one chunk of text from translate_tts."""
+        async with self._fetch_semaphore:
+            response = await self._http_client.get(
+                TRANSLATE_TTS_URL,
+                params={
+                    "ie": "UTF-8",
+                    "q": text,
+                    "tl": LANGUAGE_CODES.get(language, 'en'),
+                    "client": "tw-ob"
+                }
+            )
+        if response.status_code != 200 or not response.content:
+            return None
+        return response.content
+
     def _gtts_sync_generate(self, text: str, language: str, file_path: Path) -> bool:
         """Synchronous gTTS generation."""
         try:
+            from gtts import gTTS
+
             # Get language code
-            lang_code = self.LANGUAGE_CODES.get(language, 'en')
+            lang_code = LANGUAGE_CODES.get(language, 'en')
             
             # Create TTS object
             tts = gTTS(text=text, lang=lang_code, slow=False)
@@ -194,18 +536,19 @@ class TTSService:
     ) -> bool:
         """Generate voice using offline TTS engine."""
         try:
-            if not self.offline_engine:
+            if not self._ensure_offline_engine():
                 return False
-            
-            # Run in thread pool
-            loop = asyncio.get_event_loop()
-            success = await loop.run_in_executor(
-                None,
-                self._offline_sync_generate,
-                text,
-                file_path,
-                settings
-            )
+
+            # Run in the TTS thread pool, one job at a time (the engine is shared)
+            async with self._offline_semaphore:
+                loop = asyncio.get_event_loop()
+                success = await loop.run_in_executor(
+                    self._executor,
+                    self._offline_sync_generate,
+                    text,
+                    file_path,
+                    settings
+                )
             return success
         except Exception as e:
             print(f"Offline TTS generation failed: {e}")
@@ -231,40 +574,71 @@ class TTSService:
         """Clean and prepare text for TTS."""
         if not text:
             return ""
-        
-        # Remove excessive whitespace
-        cleaned = ' '.join(text.split())
-        
-        # Remove special characters that might cause issues
-        cleaned = cleaned.replace('*', '').replace('#', '').replace('_', '')
-        
+
+        # Drop markup characters and collapse whitespace in one regex pass
+        cleaned = _CLEAN_PATTERN.sub(_clean_replacement, text).strip()
+
         # Limit text length (most TTS services have limits)
         if len(cleaned) > 1000:
             cleaned = cleaned[:1000] + "..."
         
         return cleaned
     
+    # How often the scheduled cleanup sweep runs
+    CLEANUP_INTERVAL_SECONDS = 24 * 60 * 60
+
+    async def cleanup_loop(self, days_old: int = 7):
+        """Periodically delete old voice files without blocking the loop.
+
+        Runs the directory sweep on the TTS worker pool once per interval;
+        meant to be started as a background task from the app lifespan.
+        """
+        loop = asyncio.get_event_loop()
+        while True:
+            await asyncio.sleep(self.CLEANUP_INTERVAL_SECONDS)
+            try:
+                await loop.run_in_executor(
+                    self._executor,
+                    self.delete_old_voice_files,
+                    days_old
+                )
+            except Exception as e:
+                print(f"Scheduled voice cleanup failed: {e}")
+
+    async def close(self):
+        """Release the HTTP client and worker pool on shutdown."""
+        await self._http_client.aclose()
+        self._executor.shutdown(wait=False)
+
     def get_available_languages(self) -> list:
         """Get list of available languages."""
-        return list(self.LANGUAGE_CODES.keys())
+        return list(LANGUAGE_CODES.keys())
     
     def get_voice_info(self, language: str) -> dict:
         """Get voice information for a language."""
-        return self.VOICE_SETTINGS.get(language, self.VOICE_SETTINGS['en'])
+        return VOICE_SETTINGS.get(language, VOICE_SETTINGS['en'])
     
     def delete_old_voice_files(self, days_old: int = 7):
         """Delete voice files older than specified days."""
         try:
+            self._ensure_storage()
+
             import time
             current_time = time.time()
             cutoff_time = current_time - (days_old * 24 * 60 * 60)
-            
+
+            # scandir surfaces each entry's stat from the directory walk
+            # itself, so this is one pass with no per-file stat syscall and
+            # no glob pattern matching overhead
             deleted_count = 0
-            for file_path in self.output_dir.glob("*.mp3"):
-                if file_path.stat().st_mtime < cutoff_time:
-                    file_path.unlink()
-                    deleted_count += 1
-            
+            with os.scandir(self.output_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(".mp3") or not entry.is_file():
+                        continue
+                    if entry.stat().st_mtime < cutoff_time:
+                        os.unlink(entry.path)
+                        deleted_count += 1
+
             print(f"Deleted {deleted_count} old voice files")
             return deleted_count
             
@@ -4,17 +4,16 @@ Main FastAPI application for the Agricultural Advisory System.
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 import uvicorn
+import asyncio
 import os
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
-from app.core.database import engine, Base
-from app.api import disease, weather
-
-# Create uploads directory
-os.makedirs(settings.upload_dir, exist_ok=True)
+from app.core.database import create_tables
+from app.api import disease, voice, weather
+from app.services.tts_service import tts_service
 
 
 @asynccontextmanager
@@ -22,15 +21,26 @@ async def lifespan(app: FastAPI):
     """Application lifespan events."""
     # Startup
     print("Starting Agricultural Advisory System...")
+
+    # Create the uploads directory here rather than at import time, so
+    # importing the module (tooling, tests, reload workers) has no
+    # filesystem side effects
+    os.makedirs(settings.upload_dir, exist_ok=True)
     
-    # Create database tables
-    Base.metadata.create_all(bind=engine)
-    print("Database tables created successfully.")
-    
+    # Create database tables (skipped when the schema already exists)
+    create_tables()
+    print("Database tables ready.")
+
+    # Sweep old voice files in the background instead of on request paths
+    cleanup_task = asyncio.create_task(tts_service.cleanup_loop())
+
     yield
-    
+
     # Shutdown
     print("Shutting down Agricultural Advisory System...")
+    cleanup_task.cancel()
+    await weather.close_clients()
+    await tts_service.close()
 
 
 # Create FastAPI application
@@ -38,7 +48,10 @@ app = FastAPI(
     title="Agricultural Advisory System",
     description="AI-powered platform for agricultural advisories, weather data, and crop disease detection",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    # orjson serializes response payloads several times faster than stdlib
+    # json and handles datetimes natively
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -50,11 +63,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount static files
-app.mount("/uploads", StaticFiles(directory=settings.upload_dir), name="uploads")
+# Mount static files; check_dir=False defers the directory existence check
+# from import time to first use (lifespan creates it before any request)
+app.mount("/uploads", StaticFiles(directory=settings.upload_dir, check_dir=False), name="uploads")
 
 # Include API routers
 app.include_router(disease.router)
+app.include_router(voice.router)
 app.include_router(weather.router)
 
 
@@ -86,7 +101,7 @@ async def health_check():
 @app.exception_handler(404)
 async def not_found_handler(request, exc):
     """Custom 404 handler."""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=404,
         content={
             "success": False,
@@ -94,6 +109,7 @@ async def not_found_handler(request, exc):
             "available_endpoints": [
                 "/api/disease/detect",
                 "/api/disease/history",
+                "/api/voice/synthesize",
                 "/api/weather/current",
                 "/api/weather/forecast",
                 "/docs"
@@ -105,7 +121,7 @@ async def not_found_handler(request, exc):
 @app.exception_handler(500)
 async def internal_error_handler(request, exc):
     """Custom 500 handler."""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "success": False,
@@ -116,10 +132,14 @@ async def internal_error_handler(request, exc):
 
 
 if __name__ == "__main__":
+    # Auto-reload re-imports this module in the reload worker on top of the
+    # __main__ parse (models, settings and the ML stack all load twice), so
+    # it is opt-in for development instead of always on
+    reload = os.getenv("UVICORN_RELOAD", "").lower() in ("1", "true", "yes")
     uvicorn.run(
-        "main:app",
+        app if not reload else "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
+        reload=reload,
         log_level=settings.log_level.lower()
     )
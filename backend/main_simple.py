@@ -2,13 +2,19 @@
 Simplified FastAPI application for the Agricultural Advisory System.
 This version works without heavy ML dependencies for demonstration purposes.
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import uvicorn
+import json
 import os
 from datetime import datetime
 
+
+def _static_json(payload: dict) -> bytes:
+    """Serialize a constant endpoint payload once at import time."""
+    return json.dumps(payload).encode()
+
 # Create FastAPI application
 app = FastAPI(
     title="Agricultural Advisory System",
@@ -26,19 +32,24 @@ app.add_middleware(
 )
 
 
+# Constant response bodies, serialized once; the handlers return raw bytes
+# instead of re-encoding the same dict on every request
+_ROOT_BODY = _static_json({
+    "message": "Agricultural Advisory System API",
+    "version": "1.0.0",
+    "status": "running",
+    "endpoints": {
+        "disease_detection": "/api/disease",
+        "weather": "/api/weather",
+        "documentation": "/docs"
+    }
+})
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
-    return {
-        "message": "Agricultural Advisory System API",
-        "version": "1.0.0",
-        "status": "running",
-        "endpoints": {
-            "disease_detection": "/api/disease",
-            "weather": "/api/weather",
-            "documentation": "/docs"
-        }
-    }
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 
 @app.get("/health")
@@ -80,29 +91,32 @@ async def detect_disease_demo():
     }
 
 
+_SUPPORTED_CROPS_BODY = _static_json({
+    "success": True,
+    "crops": ["rice", "wheat", "maize", "tomato", "potato"],
+    "disease_classes": {
+        "rice": {
+            0: "Healthy",
+            1: "Brown Spot",
+            2: "Bacterial Leaf Blight",
+            3: "Leaf Smut",
+            4: "Rice Blast"
+        },
+        "wheat": {
+            0: "Healthy",
+            1: "Rust",
+            2: "Powdery Mildew",
+            3: "Septoria",
+            4: "Fusarium Head Blight"
+        }
+    }
+})
+
+
 @app.get("/api/disease/supported-crops")
 async def get_supported_crops():
     """Get list of supported crop types."""
-    return {
-        "success": True,
-        "crops": ["rice", "wheat", "maize", "tomato", "potato"],
-        "disease_classes": {
-            "rice": {
-                0: "Healthy",
-                1: "Brown Spot",
-                2: "Bacterial Leaf Blight",
-                3: "Leaf Smut",
-                4: "Rice Blast"
-            },
-            "wheat": {
-                0: "Healthy",
-                1: "Rust",
-                2: "Powdery Mildew",
-                3: "Septoria",
-                4: "Fusarium Head Blight"
-            }
-        }
-    }
+    return Response(content=_SUPPORTED_CROPS_BODY, media_type="application/json")
 
 
 @app.get("/api/weather/current")
@@ -130,26 +144,52 @@ async def get_current_weather_demo(latitude: float = 17.3850, longitude: float =
     }
 
 
+_FORECAST_CONDITIONS = ("Clear", "Cloudy", "Rain", "Sunny", "Partly Cloudy")
+
+# (days, date) -> forecast list; the mock entries only vary with those two
+# inputs, so within a day repeated requests reuse the same list
+_forecast_cache: dict = {}
+_FORECAST_CACHE_MAX = 16
+_FORECAST_MAX_DAYS = 14
+
+
 @app.get("/api/weather/forecast")
 async def get_weather_forecast_demo(latitude: float = 17.3850, longitude: float = 78.4867, days: int = 5):
     """
     Demo weather forecast endpoint.
     Returns mock forecast data for demonstration purposes.
     """
-    forecast = []
-    for i in range(days):
-        forecast.append({
-            "date": datetime.now().strftime("%Y-%m-%d"),
-            "temperature": {
-                "min": 22 + i,
-                "max": 32 + i,
-                "avg": 27 + i
-            },
-            "humidity": 60 + (i * 2),
-            "precipitation": i * 0.5,
-            "condition": ["Clear", "Cloudy", "Rain", "Sunny", "Partly Cloudy"][i % 5]
-        })
-    
+    # Bound the forecast length so arbitrary day counts cannot grow the
+    # response (or the cache entries) without limit
+    days = max(1, min(days, _FORECAST_MAX_DAYS))
+
+    today = datetime.now().strftime("%Y-%m-%d")
+    cache_key = (days, today)
+    forecast = _forecast_cache.get(cache_key)
+    if forecast is None:
+        # Drop entries from previous dates on rollover; same-day entries for
+        # other day counts stay cached, but the cache itself stays bounded
+        stale_keys = [key for key in _forecast_cache if key[1] != today]
+        for key in stale_keys:
+            del _forecast_cache[key]
+        while len(_forecast_cache) >= _FORECAST_CACHE_MAX:
+            del _forecast_cache[next(iter(_forecast_cache))]
+        forecast = [
+            {
+                "date": today,
+                "temperature": {
+                    "min": 22 + i,
+                    "max": 32 + i,
+                    "avg": 27 + i
+                },
+                "humidity": 60 + (i * 2),
+                "precipitation": i * 0.5,
+                "condition": _FORECAST_CONDITIONS[i % 5]
+            }
+            for i in range(days)
+        ]
+        _forecast_cache[cache_key] = forecast
+
     return {
         "success": True,
         "forecast": forecast,
@@ -158,39 +198,42 @@ async def get_weather_forecast_demo(latitude: float = 17.3850, longitude: float
     }
 
 
+_MARKET_PRICES_BODY = _static_json({
+    "success": True,
+    "prices": [
+        {
+            "crop_name": "Rice",
+            "variety": "Basmati",
+            "current_price": 2800,
+            "unit": "quintal",
+            "market_name": "APMC Market",
+            "district": "Hyderabad",
+            "state": "Telangana",
+            "price_change": 2.5,
+            "trend": "rising"
+        },
+        {
+            "crop_name": "Wheat",
+            "variety": "Durum",
+            "current_price": 2200,
+            "unit": "quintal",
+            "market_name": "APMC Market",
+            "district": "Hyderabad",
+            "state": "Telangana",
+            "price_change": -1.2,
+            "trend": "falling"
+        }
+    ]
+})
+
+
 @app.get("/api/market/prices")
 async def get_market_prices_demo():
     """
     Demo market prices endpoint.
     Returns mock market data for demonstration purposes.
     """
-    return {
-        "success": True,
-        "prices": [
-            {
-                "crop_name": "Rice",
-                "variety": "Basmati",
-                "current_price": 2800,
-                "unit": "quintal",
-                "market_name": "APMC Market",
-                "district": "Hyderabad",
-                "state": "Telangana",
-                "price_change": 2.5,
-                "trend": "rising"
-            },
-            {
-                "crop_name": "Wheat",
-                "variety": "Durum",
-                "current_price": 2200,
-                "unit": "quintal",
-                "market_name": "APMC Market",
-                "district": "Hyderabad",
-                "state": "Telangana",
-                "price_change": -1.2,
-                "trend": "falling"
-            }
-        ]
-    }
+    return Response(content=_MARKET_PRICES_BODY, media_type="application/json")
 
 
 @app.post("/api/whatsapp/send")
@@ -242,10 +285,13 @@ async def internal_error_handler(request, exc):
 
 
 if __name__ == "__main__":
+    # Auto-reload re-imports this module in the reload worker on top of the
+    # __main__ parse, so it is opt-in for development instead of always on
+    reload = os.getenv("UVICORN_RELOAD", "").lower() in ("1", "true", "yes")
     uvicorn.run(
-        "main_simple:app",
+        app if not reload else "main_simple:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
+        reload=reload,
         log_level="info"
     )